@@ -0,0 +1,64 @@
+"""
+Shared fixtures for the shopping agent tests
+"""
+
+import os
+import sys
+import importlib
+import importlib.util
+
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+# Used when the configured agent timeout can't be read
+DEFAULT_TEST_TIMEOUT = 30
+
+def module_available(name):
+    """Check if a module can be found without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        # A parent package is missing
+        return False
+
+def import_or_fail(name):
+    """Import a module under test, failing the dependent tests if that fails"""
+    # Looked up first, so a missing module fails without an import attempt
+    # and the traceback that comes with it
+    if not module_available(name):
+        pytest.fail(f"{name} not found", pytrace=False)
+    try:
+        return importlib.import_module(name)
+    except Exception as e:
+        pytest.fail(f"{name} failed to import: {e}", pytrace=False)
+
+# Session-scoped so every test in a worker shares one import and one
+# configuration. A test whose fixture fails is reported as an error without
+# running, which stands in for the old runner's dependency table; failing
+# rather than skipping keeps a tree without the services from passing
+
+@pytest.fixture(scope="session")
+def config():
+    """Loaded application configuration"""
+    module = import_or_fail("src.config")
+    try:
+        return module.get_config()
+    except Exception as e:
+        pytest.fail(f"configuration failed to load: {e}", pytrace=False)
+
+@pytest.fixture(scope="session")
+def agent_timeout(config):
+    """Upper bound for one service call, slightly above the agents' own timeout"""
+    return getattr(config, 'AGENT_TIMEOUT', DEFAULT_TEST_TIMEOUT - 1) + 1
+
+@pytest.fixture(scope="session")
+def service_manager(config):
+    """The shared service manager"""
+    return import_or_fail("src.services.service_manager").service_manager
+
+@pytest.fixture(scope="session")
+def shopping(config):
+    """The shopping routes module with the local search functions"""
+    return import_or_fail("src.routes.shopping")
@@ -8,6 +8,15 @@ import sys
 import subprocess
 import importlib
 import os
+import site
+import json
+import hashlib
+import io
+import threading
+import tempfile
+import time
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 def check_python_version():
     """Check Python version and warn about compatibility"""
@@ -19,15 +28,140 @@ def check_python_version():
         return True
     return False
 
-def install_package(package_name, fallback_versions=None):
+# Package name -> [primary requirement, *fallback requirements]
+# Primaries are exact pins so pip's resolver doesn't have to backtrack through
+# old releases; the loose specs are only tried if a pin can't be installed
+CORE_PACKAGES = {
+    'flask': ['Flask==3.0.3', 'Flask>=2.3.0', 'Flask==2.3.3'],
+    'flask-cors': ['Flask-CORS==4.0.1', 'Flask-CORS>=3.0.0', 'Flask-CORS==3.0.10'],
+    'flask-sqlalchemy': ['Flask-SQLAlchemy==3.1.1', 'Flask-SQLAlchemy>=2.5.0', 'Flask-SQLAlchemy==2.5.1'],
+    'requests': ['requests==2.32.3', 'requests>=2.28.0'],
+    'python-dotenv': ['python-dotenv==1.0.1', 'python-dotenv>=0.19.0'],
+    'beautifulsoup4': ['beautifulsoup4==4.12.3', 'beautifulsoup4>=4.11.0'],
+    'langdetect': ['langdetect==1.0.9', 'langdetect>=1.0.7']
+}
+
+AI_PACKAGES = {
+    'numpy': ['numpy==2.1.3', 'numpy>=1.24.0', 'numpy==1.24.4'],
+    'scikit-learn': ['scikit-learn==1.5.2', 'scikit-learn>=1.3.0', 'scikit-learn==1.3.2'],
+}
+
+# faiss-cpu often lacks wheels for new Python versions and sentence-transformers
+# pulls in torch, so these get their own pip run
+SPECIAL_AI_PACKAGES = {
+    'sentence-transformers': [
+        'sentence-transformers>=2.2.0',
+        'sentence-transformers==2.2.2',
+        '--no-deps sentence-transformers==2.2.2'
+    ],
+    'faiss-cpu': [
+        'faiss-cpu>=1.7.0',
+        'faiss-cpu==1.7.4',
+        '--no-deps faiss-cpu==1.7.4'
+    ]
+}
+
+# Import names for packages whose availability is checked by importing them
+IMPORT_NAMES = {
+    'sentence-transformers': 'sentence_transformers',
+    'faiss-cpu': 'faiss'
+}
+
+# Skip the self-update check and prompts, and ride out slow or flaky indexes
+PIP_INSTALL_FLAGS = [
+    '--disable-pip-version-check',
+    '--no-input',
+    '--prefer-binary',
+    '--timeout', '120',
+    '--retries', '5'
+]
+
+# Set once an in-process pip run outlives its timeout; that run can't be
+# stopped, and a second pip working on the same site-packages would race it
+pip_stalled = False
+
+def pip_in_process(args, timeout):
+    """Run pip inside this interpreter, returning None if that isn't possible"""
+    global pip_stalled
+    try:
+        from pip._internal.cli.main import main as pip_main
+    except ImportError:
+        return None
+    
+    result = {}
+    
+    def run():
+        try:
+            result['code'] = pip_main(['install'] + args)
+        except (Exception, SystemExit):
+            pass
+    
+    # pip runs on a worker thread so the wait for it can time out like the
+    # subprocess does; the thread is a daemon so a stalled run can't block exit
+    worker = threading.Thread(target=run, daemon=True)
+    saved_argv, saved_stdout, saved_stderr = sys.argv, sys.stdout, sys.stderr
+    output = io.StringIO()
+    try:
+        sys.argv = [sys.executable, '-m', 'pip']
+        # Stay as quiet as the captured subprocess run
+        sys.stdout = sys.stderr = output
+        worker.start()
+        worker.join(timeout)
+    finally:
+        # Restored here rather than by the worker, so the installer's own
+        # output comes back even while a stalled run is still going
+        sys.argv, sys.stdout, sys.stderr = saved_argv, saved_stdout, saved_stderr
+        importlib.invalidate_caches()
+    
+    if worker.is_alive():
+        pip_stalled = True
+        raise subprocess.TimeoutExpired([sys.executable, '-m', 'pip', 'install'] + args, timeout)
+    return result.get('code')
+
+def run_pip(requirements, timeout=300, binary_only=(), constraints=None):
+    """Run a single pip install, accepting only wheels for the binary_only packages"""
+    args = list(PIP_INSTALL_FLAGS)
+    if binary_only:
+        # Fail fast instead of attempting a long source build that breaks anyway
+        args.append('--only-binary=' + ','.join(sorted(binary_only)))
+    for requirement in requirements:
+        args.extend(requirement.split())
+    
+    if not constraints:
+        return run_pip_args(args, timeout)
+    
+    # pip only reads constraints from a file
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        constraints_file = os.path.join(tmp_dir, 'constraints.txt')
+        with open(constraints_file, 'w') as f:
+            f.write("\n".join(constraints) + "\n")
+        return run_pip_args(['--constraint', constraints_file] + args, timeout)
+
+def run_pip_args(args, timeout):
+    """Run pip install with prepared arguments"""
+    if pip_stalled:
+        raise RuntimeError("an earlier pip run timed out and is still running")
+    
+    # Skips an interpreter start-up per call; pip's API is private, so any
+    # failure is retried in a subprocess. A timeout is not retried, since
+    # the stalled run is still going
+    if pip_in_process(args, timeout) == 0:
+        return True
+    
+    # Only stderr is worth keeping, and only for reporting a failure
+    result = subprocess.run([sys.executable, '-m', 'pip', 'install'] + args,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    if result.returncode != 0 and result.stderr.strip():
+        print(f"   {result.stderr.strip().splitlines()[-1]}")
+    return result.returncode == 0
+
+def install_package(package_name, fallback_versions=None, binary_only=()):
     """Install a package with fallback versions"""
     print(f"📦 Installing {package_name}...")
     
     # Try main package first
     try:
-        result = subprocess.run([sys.executable, '-m', 'pip', 'install', package_name], 
-                              capture_output=True, text=True, timeout=300)
-        if result.returncode == 0:
+        if run_pip([package_name], binary_only=binary_only):
             print(f"✅ {package_name} installed successfully")
             return True
     except subprocess.TimeoutExpired:
@@ -40,9 +174,7 @@ def install_package(package_name, fallback_versions=None):
         for fallback in fallback_versions:
             print(f"🔄 Trying fallback: {fallback}")
             try:
-                result = subprocess.run([sys.executable, '-m', 'pip', 'install', fallback], 
-                                      capture_output=True, text=True, timeout=300)
-                if result.returncode == 0:
+                if run_pip([fallback], binary_only=binary_only):
                     print(f"✅ {fallback} installed successfully")
                     return True
             except Exception as e:
@@ -50,99 +182,87 @@ def install_package(package_name, fallback_versions=None):
     
     return False
 
-def install_core_dependencies():
-    """Install core dependencies that are essential"""
-    core_packages = {
-        'flask': ['Flask>=2.3.0', 'Flask==2.3.3'],
-        'flask-cors': ['Flask-CORS>=3.0.0', 'Flask-CORS==3.0.10'],
-        'flask-sqlalchemy': ['Flask-SQLAlchemy>=2.5.0', 'Flask-SQLAlchemy==2.5.1'],
-        'requests': ['requests>=2.28.0'],
-        'python-dotenv': ['python-dotenv>=0.19.0'],
-        'beautifulsoup4': ['beautifulsoup4>=4.11.0'],
-        'langdetect': ['langdetect>=1.0.7']
-    }
+def installed_constraints(packages):
+    """Pin the currently installed versions of the given packages"""
+    constraints = []
+    for package in packages:
+        try:
+            constraints.append(f"{package}=={metadata.version(package)}")
+        except metadata.PackageNotFoundError:
+            pass
+    return constraints
+
+def install_packages(packages, binary_only=(), constraints=None):
+    """Install a group of packages with one pip run, retrying failures one by one"""
+    requirements = [versions[0] for versions in packages.values()]
+    print(f"📦 Installing {', '.join(packages)}...")
     
+    try:
+        if run_pip(requirements, timeout=600, binary_only=binary_only, constraints=constraints):
+            for requirement in requirements:
+                print(f"✅ {requirement} installed successfully")
+            return set(packages)
+    except subprocess.TimeoutExpired:
+        print("⏰ Batch installation timed out")
+    except Exception as e:
+        print(f"❌ Error during batch installation: {e}")
+    
+    # pip resolves a batch as a whole, so one bad package fails them all;
+    # anything that is already usable doesn't need another pip run
+    installed = {package for package in packages
+                 if is_available(IMPORT_NAMES.get(package, package), package)}
+    print("🔄 Batch install failed, installing missing packages individually...")
+    for package, versions in packages.items():
+        if package in installed:
+            continue
+        if install_package(versions[0], versions[1:], binary_only=binary_only):
+            installed.add(package)
+    
+    return installed
+
+def install_core_dependencies():
+    """Install core dependencies together with the basic AI/ML packages"""
     print("🔧 Installing core dependencies...")
-    success_count = 0
-    
-    for package, versions in core_packages.items():
-        if install_package(versions[0], versions[1:] if len(versions) > 1 else None):
-            success_count += 1
-    
-    return success_count, len(core_packages)
+    return install_packages({**CORE_PACKAGES, **AI_PACKAGES})
 
-def install_ai_dependencies():
+def install_ai_dependencies(installed):
     """Install AI/ML dependencies with special handling for Python 3.13"""
     print("🤖 Installing AI/ML dependencies...")
     
-    # Check if we can install the full AI stack
-    ai_packages = [
-        ('numpy', ['numpy>=1.24.0', 'numpy==1.24.4']),
-        ('scikit-learn', ['scikit-learn>=1.3.0', 'scikit-learn==1.3.2']),
-    ]
-    
-    success_count = 0
-    for package_name, versions in ai_packages:
-        if install_package(versions[0], versions[1:]):
-            success_count += 1
+    # numpy and scikit-learn were already handled in the core batch
+    success_count = len(installed & AI_PACKAGES.keys())
     
-    # Try sentence-transformers with special handling
-    print("📝 Installing sentence-transformers...")
-    sentence_transformers_installed = False
+    print("📝 Installing sentence-transformers and faiss-cpu...")
+    # Keep this batch from moving anything the core batch just installed
+    constraints = installed_constraints({**CORE_PACKAGES, **AI_PACKAGES})
     
-    # Try different approaches for sentence-transformers
-    approaches = [
-        'sentence-transformers>=2.2.0',
-        'sentence-transformers==2.2.2',
-        '--no-deps sentence-transformers==2.2.2'
-    ]
+    # faiss-cpu's sdist doesn't build on Python 3.13, so only accept its wheels and use
+    # fallbacks otherwise; sentence-transformers is pure Python and its older releases
+    # are sdist-only, so it may still build from source
+    special_installed = install_packages(SPECIAL_AI_PACKAGES, binary_only={'faiss-cpu'}, constraints=constraints)
+    success_count += len(special_installed)
     
-    for approach in approaches:
-        try:
-            cmd = [sys.executable, '-m', 'pip', 'install'] + approach.split()
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
-                sentence_transformers_installed = True
-                print("✅ sentence-transformers installed successfully")
-                break
-        except Exception as e:
-            print(f"❌ Approach '{approach}' failed: {e}")
-    
-    if sentence_transformers_installed:
-        success_count += 1
-    
-    # Try faiss-cpu with special handling
-    print("🔍 Installing faiss-cpu...")
-    faiss_installed = False
-    
-    faiss_approaches = [
-        'faiss-cpu>=1.7.0',
-        'faiss-cpu==1.7.4',
-        '--no-deps faiss-cpu==1.7.4'
-    ]
-    
-    for approach in faiss_approaches:
-        try:
-            cmd = [sys.executable, '-m', 'pip', 'install'] + approach.split()
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            if result.returncode == 0:
-                faiss_installed = True
-                print("✅ faiss-cpu installed successfully")
-                break
-        except Exception as e:
-            print(f"❌ Faiss approach '{approach}' failed: {e}")
-    
-    if faiss_installed:
-        success_count += 1
-    
-    return success_count, len(ai_packages) + 2  # +2 for sentence-transformers and faiss
+    return success_count, len(AI_PACKAGES) + len(SPECIAL_AI_PACKAGES)
+
+def write_if_changed(path, content):
+    """Write content to path unless the file already holds exactly that content"""
+    # Rewriting an identical file would still invalidate its cached bytecode
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == content.encode():
+                return False
+    
+    with open(path, 'w', newline='') as f:
+        f.write(content)
+    return True
 
 def create_minimal_fallback():
     """Create minimal fallback implementations for missing dependencies"""
     print("🔧 Creating fallback implementations...")
     
     fallback_dir = "src/fallbacks"
-    os.makedirs(fallback_dir, exist_ok=True)
+    if not os.path.isdir(fallback_dir):
+        os.makedirs(fallback_dir)
     
     # Create minimal sentence transformer fallback
     fallback_sentence_transformer = '''
@@ -162,27 +282,17 @@ class SentenceTransformer:
         if isinstance(sentences, str):
             sentences = [sentences]
         
-        embeddings = []
-        for sentence in sentences:
-            # Create a simple hash-based embedding
-            hash_obj = hashlib.md5(sentence.lower().encode())
-            hash_hex = hash_obj.hexdigest()
-            
-            # Convert hex to numbers and normalize
-            embedding = [int(hash_hex[i:i+2], 16) / 255.0 for i in range(0, min(len(hash_hex), 64), 2)]
-            
-            # Pad or truncate to fixed size (384 dimensions like MiniLM)
-            while len(embedding) < 384:
-                embedding.extend(embedding[:min(384-len(embedding), len(embedding))])
-            embedding = embedding[:384]
-            
-            embeddings.append(embedding)
+        # Create a simple hash-based embedding: 16 digest bytes per sentence
+        digests = [hashlib.blake2b(sentence.lower().encode(), digest_size=16).digest() for sentence in sentences]
+        embeddings = np.frombuffer(b"".join(digests), dtype=np.uint8).reshape(len(sentences), 16)
+        embeddings = embeddings.astype(np.float32) / 255.0
         
-        return np.array(embeddings, dtype=np.float32)
+        # Repeat to a fixed size (384 dimensions like MiniLM)
+        return np.tile(embeddings, (1, 24))
 '''
     
-    with open(f"{fallback_dir}/sentence_transformers.py", "w") as f:
-        f.write(fallback_sentence_transformer)
+    if not write_if_changed(f"{fallback_dir}/sentence_transformers.py", fallback_sentence_transformer):
+        print("✅ sentence-transformers fallback already up-to-date")
     
     # Create minimal faiss fallback
     fallback_faiss = '''
@@ -194,29 +304,55 @@ import numpy as np
 class IndexFlatIP:
     def __init__(self, dimension):
         self.dimension = dimension
-        self.vectors = []
         self.is_trained = True
+        # Added batches are kept as-is and only stacked when a search needs them
+        self._chunks = []
+        self._consolidated = None
+    
+    @property
+    def vectors(self):
+        """All indexed vectors as a single array"""
+        if self._consolidated is None:
+            if self._chunks:
+                self._consolidated = np.vstack(self._chunks)
+            else:
+                self._consolidated = np.empty((0, self.dimension), dtype=np.float32)
+            self._chunks = [self._consolidated]
+        return self._consolidated
+    
+    @property
+    def ntotal(self):
+        """Number of indexed vectors"""
+        return sum(len(chunk) for chunk in self._chunks)
     
     def add(self, vectors):
         """Add vectors to the index"""
-        if len(self.vectors) == 0:
-            self.vectors = vectors.copy()
-        else:
-            self.vectors = np.vstack([self.vectors, vectors])
+        self._chunks.append(np.array(vectors, dtype=np.float32))
+        self._consolidated = None
     
     def search(self, query_vectors, k):
         """Simple cosine similarity search"""
+        query_vectors = np.atleast_2d(query_vectors)
         if len(self.vectors) == 0:
-            return np.array([[0.0] * k]), np.array([[0] * k])
+            return np.zeros((len(query_vectors), k)), np.zeros((len(query_vectors), k), dtype=np.int64)
+        
+        # Compute cosine similarity for every query at once
+        similarities = query_vectors @ self.vectors.T
         
-        # Compute cosine similarity
-        similarities = np.dot(query_vectors, self.vectors.T)
+        # Select the top k per query without sorting the whole row
+        k = min(k, similarities.shape[1])
+        if k < similarities.shape[1]:
+            top_k_indices = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top_k_indices = np.tile(np.arange(k), (len(similarities), 1))
+        top_k_scores = np.take_along_axis(similarities, top_k_indices, axis=1)
         
-        # Get top k results
-        top_k_indices = np.argsort(similarities[0])[::-1][:k]
-        top_k_scores = similarities[0][top_k_indices]
+        # Only the k selected entries need ordering
+        order = np.argsort(-top_k_scores, axis=1)
+        top_k_indices = np.take_along_axis(top_k_indices, order, axis=1)
+        top_k_scores = np.take_along_axis(top_k_scores, order, axis=1)
         
-        return np.array([top_k_scores]), np.array([top_k_indices])
+        return top_k_scores, top_k_indices
 
 def normalize_L2(vectors):
     """Normalize vectors to unit length"""
@@ -233,52 +369,155 @@ def write_index(index, path):
     pass
 '''
     
-    with open(f"{fallback_dir}/faiss.py", "w") as f:
-        f.write(fallback_faiss)
+    if not write_if_changed(f"{fallback_dir}/faiss.py", fallback_faiss):
+        print("✅ faiss fallback already up-to-date")
     
     print("✅ Fallback implementations created")
 
+# These may be installed with --no-deps as a last resort, so metadata alone
+# doesn't prove they can actually be loaded
+LOAD_CHECKED_MODULES = {'sentence_transformers', 'faiss'}
+
+def is_available(import_name, package_name):
+    """Check if a package is installed, importing it only when metadata isn't enough"""
+    if import_name in LOAD_CHECKED_MODULES:
+        try:
+            importlib.import_module(import_name)
+            return True
+        except ImportError:
+            return False
+    
+    try:
+        metadata.distribution(package_name)
+        return True
+    except metadata.PackageNotFoundError:
+        return False
+
+# Probe results are cached here until the interpreter or site-packages change
+DEP_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'regional_shopping_ai', 'deps.json')
+
+def dep_cache_key():
+    """Build a cache key from the interpreter and the newest site-packages mtime"""
+    site_dirs = site.getsitepackages() + [site.getusersitepackages()]
+    mtimes = [os.path.getmtime(path) for path in site_dirs if os.path.isdir(path)]
+    raw = f"{sys.executable}|{sys.version}|{max(mtimes, default=0)}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+def load_dep_cache(key):
+    """Load cached probe results if they were recorded for this environment"""
+    try:
+        with open(DEP_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if cache.get('key') != key:
+        return {}
+    return cache.get('available', {})
+
+def save_dep_cache(key, available):
+    """Persist probe results for the next run"""
+    try:
+        os.makedirs(os.path.dirname(DEP_CACHE_FILE), exist_ok=True)
+        with open(DEP_CACHE_FILE, 'w') as f:
+            json.dump({'key': key, 'available': available}, f)
+    except OSError as e:
+        print(f"⚠️  Could not write dependency cache: {e}")
+
+# Written into the environment after a successful install; while it matches the
+# running interpreter, startup can trust the environment without probing it
+DEPS_OK_FILE = os.path.join(sys.prefix, '.deps_ok')
+
+def write_deps_ok(available):
+    """Mark the current environment as verified, recording which modules loaded"""
+    # Optional modules can be missing after a successful install, so readers
+    # check the modules they need against this list rather than the marker alone
+    verified = sorted(module for module, ok in available.items() if ok)
+    try:
+        with open(DEPS_OK_FILE, 'w') as f:
+            json.dump({'python': sys.version, 'prefix': sys.prefix, 'ts': time.time(),
+                       'modules': verified}, f)
+    except OSError as e:
+        print(f"⚠️  Could not write {DEPS_OK_FILE}: {e}")
+
+def deps_ok(modules):
+    """Check if a previous install verified all (import_name, package_name) pairs here"""
+    try:
+        with open(DEPS_OK_FILE) as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return False
+    
+    if marker.get('python') != sys.version or marker.get('prefix') != sys.prefix:
+        return False
+    
+    verified = set(marker.get('modules', ()))
+    return all(import_name in verified for import_name, _ in modules)
+
+def probe_imports(modules, use_cache=True):
+    """Check (import_name, package_name) pairs concurrently and report which are available"""
+    key = dep_cache_key()
+    # Without the cache everything is probed again and the fresh results replace it
+    cached = load_dep_cache(key) if use_cache else {}
+    pending = [(import_name, package_name) for import_name, package_name in modules
+               if import_name not in cached]
+    
+    if not pending:
+        return cached
+    
+    available = dict(cached)
+    with ThreadPoolExecutor(max_workers=min(len(pending), 8)) as executor:
+        futures = {
+            executor.submit(is_available, import_name, package_name): import_name
+            for import_name, package_name in pending
+        }
+        for future in as_completed(futures):
+            available[futures[future]] = future.result()
+    
+    save_dep_cache(key, available)
+    return available
+
+CRITICAL_IMPORTS = [
+    ('flask', 'Flask'),
+    ('flask_cors', 'Flask-CORS'),
+    ('flask_sqlalchemy', 'Flask-SQLAlchemy'),
+    ('requests', 'requests'),
+    ('dotenv', 'python-dotenv'),
+    ('bs4', 'beautifulsoup4'),
+    ('langdetect', 'langdetect')
+]
+
+OPTIONAL_IMPORTS = [
+    ('sentence_transformers', 'sentence-transformers'),
+    ('faiss', 'faiss-cpu'),
+    ('numpy', 'numpy'),
+    ('sklearn', 'scikit-learn')
+]
+
 def test_imports():
     """Test if critical imports work"""
     print("🧪 Testing imports...")
     
-    critical_imports = [
-        'flask',
-        'flask_cors',
-        'flask_sqlalchemy',
-        'requests',
-        'dotenv',
-        'bs4',
-        'langdetect'
-    ]
-    
-    optional_imports = [
-        'sentence_transformers',
-        'faiss',
-        'numpy',
-        'sklearn'
-    ]
-    
     working_critical = 0
     working_optional = 0
     
-    for module in critical_imports:
-        try:
-            importlib.import_module(module)
+    available = probe_imports(CRITICAL_IMPORTS + OPTIONAL_IMPORTS)
+    
+    for module, _ in CRITICAL_IMPORTS:
+        if available[module]:
             print(f"✅ {module}")
             working_critical += 1
-        except ImportError:
+        else:
             print(f"❌ {module} - CRITICAL")
     
-    for module in optional_imports:
-        try:
-            importlib.import_module(module)
+    for module, _ in OPTIONAL_IMPORTS:
+        if available[module]:
             print(f"✅ {module}")
             working_optional += 1
-        except ImportError:
+        else:
             print(f"⚠️  {module} - will use fallback")
     
-    return working_critical, len(critical_imports), working_optional, len(optional_imports)
+    return working_critical, len(CRITICAL_IMPORTS), working_optional, len(OPTIONAL_IMPORTS)
 
 def main():
     """Main installation function"""
@@ -292,16 +531,18 @@ def main():
     print("📦 Upgrading pip...")
     try:
         subprocess.run([sys.executable, '-m', 'pip', 'install', '--upgrade', 'pip'], 
-                      capture_output=True, timeout=120)
+                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
         print("✅ pip upgraded")
     except Exception as e:
         print(f"⚠️  pip upgrade failed: {e}")
     
     # Install core dependencies
-    core_success, core_total = install_core_dependencies()
+    installed = install_core_dependencies()
+    core_success = len(installed & CORE_PACKAGES.keys())
+    core_total = len(CORE_PACKAGES)
     
     # Install AI dependencies
-    ai_success, ai_total = install_ai_dependencies()
+    ai_success, ai_total = install_ai_dependencies(installed)
     
     # Create fallbacks if needed
     if ai_success < ai_total:
@@ -321,6 +562,8 @@ def main():
     
     if critical_working == critical_total:
         print("🎉 All critical dependencies installed successfully!")
+        # Served from the probe cache test_imports just filled
+        write_deps_ok(probe_imports(CRITICAL_IMPORTS + OPTIONAL_IMPORTS))
         print("🚀 You can now run: python start_app.py")
         return 0
     else:
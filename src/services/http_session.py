@@ -0,0 +1,22 @@
+"""
+Shared HTTP session for the shopping search services
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Tavily searches are POSTs but have no side effects, so they are safe to retry
+RETRIES = Retry(
+    total=3,
+    backoff_factor=0.3,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset(['GET', 'POST'])
+)
+
+# One pooled session per process keeps TCP/TLS connections alive between
+# calls to the same host instead of reconnecting for every search
+SESSION = requests.Session()
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=RETRIES)
+SESSION.mount("https://", adapter)
+SESSION.mount("http://", adapter)
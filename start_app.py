@@ -7,10 +7,15 @@ import os
 import sys
 import subprocess
 import time
+import importlib.util
+
+from install_dependencies import probe_imports, deps_ok
 
 def check_dependencies():
     """Check if all required dependencies are installed"""
-    print("🔍 Checking dependencies...")
+    if os.environ.get('REGIONAL_SHOP_AI_SKIP_DEP_CHECK') == '1':
+        print("⏭️  Skipping dependency check (REGIONAL_SHOP_AI_SKIP_DEP_CHECK=1)")
+        return True
     
     required_packages = [
         ('flask', 'flask'),
@@ -24,13 +29,17 @@ def check_dependencies():
         ('dotenv', 'python-dotenv')
     ]
     
-    missing_packages = []
+    # Forcing a check bypasses both the installer's marker and the probe cache
+    force_check = os.environ.get('REGIONAL_SHOP_AI_FORCE_CHECK') == '1'
+    if not force_check and deps_ok(required_packages):
+        print("✅ Dependencies verified by installer (set REGIONAL_SHOP_AI_FORCE_CHECK=1 to re-check)")
+        return True
     
-    for import_name, package_name in required_packages:
-        try:
-            __import__(import_name)
-        except ImportError:
-            missing_packages.append(package_name)
+    print("🔍 Checking dependencies...")
+    
+    available = probe_imports(required_packages, use_cache=not force_check)
+    missing_packages = [package_name for import_name, package_name in required_packages
+                        if not available[import_name]]
     
     if missing_packages:
         print(f"❌ Missing packages: {', '.join(missing_packages)}")
@@ -52,13 +61,25 @@ def check_environment():
     print("✅ Environment file found")
     return True
 
+# Room for test_agents.py's own limits to trip first: on a single worker the
+# six agent calls (30s each by default) plus a cold local model load (120s)
+# add up to 300s, and start-up and imports need a margin on top
+AGENT_TESTS_TIMEOUT = 360
+
 def run_tests():
     """Run agent tests"""
     print("🧪 Running agent tests...")
     
+    # The installer doesn't provide the test tools, only requirements.txt does
+    missing = [name for name in ('pytest', 'pytest_asyncio') if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"⏭️  Skipping agent tests: {', '.join(name.replace('_', '-') for name in missing)} not installed")
+        print("💡 Run: pip install pytest pytest-asyncio pytest-xdist")
+        return True
+    
     try:
         result = subprocess.run([sys.executable, 'test_agents.py'], 
-                              capture_output=True, text=True, timeout=60)
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=AGENT_TESTS_TIMEOUT)
         
         if result.returncode == 0:
             print("✅ All agents are working properly")
@@ -105,6 +126,7 @@ def start_flask_app():
 def main():
     """Main startup function"""
     print("🎯 Regional Shopping AI - Startup Script")
+    print("💡 Set REGIONAL_SHOP_AI_RUN_TESTS=1 to run agent tests before starting")
     print("=" * 50)
     
     # Check dependencies
@@ -115,8 +137,9 @@ def main():
     if not check_environment():
         return 1
     
-    # Run tests
-    run_tests()
+    # Run tests only on request; their result never blocks startup anyway
+    if os.environ.get('REGIONAL_SHOP_AI_RUN_TESTS') == '1':
+        run_tests()
     
     # Start application
     if not start_flask_app():
@@ -3,32 +3,40 @@ import requests
 import json
 import pandas as pd
 from datetime import datetime
-import time
 import os
 import sys
 import hashlib
 
-# Add the src directory to the path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-# Import the services directly
-try:
-    from src.services.tavily_shopping_search import TavilyShoppingService
-except ImportError as e:
-    st.error(f"Import error: {e}")
-    st.stop()
-
 # Initialize services
 @st.cache_resource
 def init_services():
     """Initialize services"""
+    # Streamlit reruns this script on every interaction, so the path setup and
+    # the service import graph live here to run once per process
+    src_dir = os.path.join(os.path.dirname(__file__), 'src')
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+    
+    # Import the services directly; an ImportError propagates so that
+    # cache_resource doesn't cache it and the next rerun tries again
+    from src.services.tavily_shopping_search import TavilyShoppingService
+    from src.services.http_session import SESSION
+    
     try:
         tavily_service = TavilyShoppingService()
+        # Keep connections alive between searches instead of a new TLS handshake each time
+        tavily_service.session = SESSION
         return tavily_service
     except Exception as e:
         st.error(f"Error initializing services: {e}")
         return None
 
+@st.cache_data(ttl=600, show_spinner=False)
+def search_products_cached(_tavily_service, query, limit):
+    """Search products, reusing results across Streamlit reruns"""
+    # The leading underscore keeps Streamlit from hashing the service object
+    return _tavily_service.search_products(query, limit)
+
 # Page configuration
 st.set_page_config(
     page_title="Regional Shopping AI",
@@ -85,9 +93,23 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def item_key(item):
+    """Identify a product or list item, by URL when it has one"""
+    # Products without a URL still need a stable key, or the results table
+    # can't tell that they are already in the list
+    return item.get('url') or f"{item.get('title', 'Product')}|{item.get('source', 'Unknown')}"
+
 # Initialize session state
 if 'shopping_list' not in st.session_state:
     st.session_state.shopping_list = []
+if 'shopping_list_keys' not in st.session_state:
+    # Keys of the items already in the list, for constant-time duplicate checks
+    st.session_state.shopping_list_keys = {item_key(item) for item in st.session_state.shopping_list}
+if 'shopping_list_version' not in st.session_state:
+    # Bumped when the list changes outside the results table, so the table is rebuilt
+    st.session_state.shopping_list_version = 0
+if 'results_snapshot' not in st.session_state:
+    st.session_state.results_snapshot = None
 
 def main():
     # Header
@@ -99,7 +121,11 @@ def main():
     """, unsafe_allow_html=True)
     
     # Initialize services
-    tavily_service = init_services()
+    try:
+        tavily_service = init_services()
+    except ImportError as e:
+        st.error(f"Import error: {e}")
+        st.stop()
     if not tavily_service:
         st.error("Failed to initialize shopping service")
         return
@@ -113,6 +139,10 @@ def main():
     with tab2:
         show_shopping_list()
 
+def truncate(text, length):
+    """Shorten text to length characters, marking the cut with an ellipsis"""
+    return text[:length] + "..." if len(text) > length else text
+
 def show_product_search(tavily_service):
     """Display the product search interface"""
     st.header("🔍 Search Products Online")
@@ -131,48 +161,66 @@ def show_product_search(tavily_service):
     if search_query:
         with st.spinner("🔍 Searching online stores..."):
             try:
-                products = tavily_service.search_products(search_query, limit)
+                products = search_products_cached(tavily_service, search_query, limit)
                 
                 if products:
                     st.success(f"Found {len(products)} products")
                     
-                    # Display products in a clean grid
-                    for i, product in enumerate(products):
-                        with st.container():
-                            col1, col2, col3 = st.columns([3, 1, 1])
-                            
-                            with col1:
-                                st.markdown(f"**{product.get('title', 'Product')[:80]}**")
-                                description = product.get('description', 'No description available')
-                                if len(description) > 120:
-                                    description = description[:120] + "..."
-                                st.write(description)
-                                
-                                # Source info
-                                source = product.get('source', 'Unknown Store')
-                                st.caption(f"📍 {source}")
-                            
-                            with col2:
-                                price = product.get('price', 'Price not available')
-                                st.markdown(f'<div class="price-tag">{price}</div>', unsafe_allow_html=True)
-                                
-                                # Relevance score
-                                score = product.get('score', 0)
-                                st.caption(f"⭐ {score:.1f}/10")
-                            
-                            with col3:
-                                # Buy button
-                                if product.get('url'):
-                                    st.link_button("🛒 Buy Now", product['url'], use_container_width=True)
-                                
-                                # Add to list button
-                                if st.button("➕ Add to List", key=f"add_{i}", use_container_width=True):
-                                    add_to_shopping_list(product)
-                                    st.success("Added to list!")
-                                    time.sleep(0.5)
-                                    st.rerun()
-                            
-                            st.divider()
+                    # Render all results as one table instead of a set of widgets per product.
+                    # The editor's widget id is derived from its data, so the frame is kept
+                    # fixed for a search; rebuilding it after every tick would drop the
+                    # browser's pending edit and lose the next click
+                    snapshot_id = (search_query, limit, st.session_state.shopping_list_version)
+                    snapshot = st.session_state.results_snapshot
+                    if snapshot is None or snapshot[0] != snapshot_id:
+                        snapshot = (snapshot_id, products, pd.DataFrame([
+                            {
+                                'add': item_key(product) in st.session_state.shopping_list_keys,
+                                'title': product.get('title', 'Product')[:80],
+                                'description': truncate(product.get('description', 'No description available'), 120),
+                                'price': product.get('price', 'Price not available'),
+                                'score': float(product.get('score', 0)),
+                                'source': product.get('source', 'Unknown Store'),
+                                'url': product.get('url', '')
+                            }
+                            for product in products
+                        ]))
+                        st.session_state.results_snapshot = snapshot
+                    # Rows are matched back to the products they were built from, even
+                    # if the cached search has since expired and returned something else
+                    _, products, results = snapshot
+                    
+                    edited = st.data_editor(
+                        results,
+                        column_config={
+                            'add': st.column_config.CheckboxColumn("➕ List"),
+                            'title': st.column_config.TextColumn("Product"),
+                            'description': st.column_config.TextColumn("Description"),
+                            'price': st.column_config.TextColumn("Price"),
+                            'score': st.column_config.ProgressColumn("⭐ Score", min_value=0, max_value=10, format="%.1f"),
+                            'source': st.column_config.TextColumn("📍 Store"),
+                            'url': st.column_config.LinkColumn("Buy", display_text="🛒 Buy Now")
+                        },
+                        disabled=[column for column in results.columns if column != 'add'],
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    
+                    # Apply checkbox changes to the shopping list in one pass, against
+                    # current membership rather than the snapshot the table started from
+                    added = 0
+                    for i, wanted in edited['add'].items():
+                        key = item_key(products[i])
+                        in_list = key in st.session_state.shopping_list_keys
+                        if wanted and not in_list:
+                            add_to_shopping_list(products[i])
+                            added += 1
+                        elif in_list and not wanted:
+                            remove_from_shopping_list(key)
+                    
+                    # The list tab renders after this one, so it already sees the change
+                    if added:
+                        st.toast("Added to list!", icon="➕")
                 else:
                     st.warning("No products found. Try different keywords.")
                     
@@ -194,6 +242,8 @@ def show_shopping_list():
         with col3:
             if st.button("🗑️ Clear All"):
                 st.session_state.shopping_list = []
+                st.session_state.shopping_list_keys = set()
+                st.session_state.shopping_list_version += 1
                 st.success("List cleared!")
                 st.rerun()
         
@@ -218,7 +268,9 @@ def show_shopping_list():
                             st.link_button("🛒", item['url'], help="Buy Now")
                     with col_b:
                         if st.button("🗑️", key=f"remove_{i}", help="Remove"):
-                            st.session_state.shopping_list.pop(i)
+                            removed = st.session_state.shopping_list.pop(i)
+                            st.session_state.shopping_list_keys.discard(item_key(removed))
+                            st.session_state.shopping_list_version += 1
                             st.rerun()
                 
                 st.divider()
@@ -243,9 +295,9 @@ def show_shopping_list():
 def add_to_shopping_list(product):
     """Add product to shopping list"""
     # Check if already in list
-    for item in st.session_state.shopping_list:
-        if item.get('url') == product.get('url'):
-            return  # Already in list
+    key = item_key(product)
+    if key in st.session_state.shopping_list_keys:
+        return  # Already in list
     
     # Add to list
     list_item = {
@@ -257,6 +309,34 @@ def add_to_shopping_list(product):
     }
     
     st.session_state.shopping_list.append(list_item)
+    st.session_state.shopping_list_keys.add(key)
+
+def remove_from_shopping_list(key):
+    """Remove the product with the given key from the shopping list"""
+    if key not in st.session_state.shopping_list_keys:
+        return
+    
+    st.session_state.shopping_list = [
+        item for item in st.session_state.shopping_list if item_key(item) != key
+    ]
+    st.session_state.shopping_list_keys.discard(key)
+
+# Shared by every session for the life of the server; only the lists being
+# exported right now are worth keeping
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_export_text(items):
+    """Build the export body for (title, price, source, url) tuples"""
+    lines = ["🛒 My Shopping List", "=" * 30, ""]
+    
+    for i, (title, price, source, url) in enumerate(items, 1):
+        lines.append(f"{i}. {title}")
+        lines.append(f"   💰 Price: {price}")
+        lines.append(f"   🏪 Store: {source}")
+        if url:
+            lines.append(f"   🔗 Link: {url}")
+        lines.append("")
+    
+    return "\n".join(lines) + "\n"
 
 def export_shopping_list():
     """Export shopping list as text"""
@@ -264,18 +344,12 @@ def export_shopping_list():
         st.warning("No items to export")
         return
     
-    # Create export text
-    export_text = "🛒 My Shopping List\n"
-    export_text += "=" * 30 + "\n\n"
-    
-    for i, item in enumerate(st.session_state.shopping_list, 1):
-        export_text += f"{i}. {item['title']}\n"
-        export_text += f"   💰 Price: {item['price']}\n"
-        export_text += f"   🏪 Store: {item['source']}\n"
-        if item.get('url'):
-            export_text += f"   🔗 Link: {item['url']}\n"
-        export_text += "\n"
-    
+    # Create export text, only rebuilding it when the list contents change
+    items = tuple(
+        (item['title'], item['price'], item['source'], item.get('url', ''))
+        for item in st.session_state.shopping_list
+    )
+    export_text = render_export_text(items)
     export_text += f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
     
     # Download button
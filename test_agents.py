@@ -1,173 +1,122 @@
 #!/usr/bin/env python3
 """
 Test script to verify all shopping agents are working properly
+
+Runs under pytest; `python test_agents.py` is a shortcut for the same run.
+Shared fixtures live in conftest.py.
 """
 
 import sys
 import os
-import traceback
+import asyncio
+import inspect
+import importlib.util
+
+import pytest
+
+# Every test is a coroutine on one event loop shared by the whole session
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
-# Add the project root to Python path
-sys.path.insert(0, os.path.dirname(__file__))
+# Loading the local embedding models can take far longer than a remote call;
+# start_app's AGENT_TESTS_TIMEOUT leaves room for this plus the other tests
+LOCAL_MODELS_TIMEOUT = 120
 
-def test_config():
+async def call(timeout, func, *args):
+    """Run a blocking service call in a worker thread, bounded by timeout"""
+    # The timeout fails the test but can't stop the thread; a call that hangs
+    # for good still delays process exit, as the interpreter waits for it
+    return await asyncio.wait_for(asyncio.to_thread(func, *args), timeout)
+
+async def test_config(config):
     """Test configuration loading"""
     print("🔧 Testing configuration...")
-    try:
-        from src.config import get_config
-        config = get_config()
-        print(f"✅ Configuration loaded successfully")
-        print(f"   - Tavily API enabled: {config.ENABLE_TAVILY_SEARCH}")
-        print(f"   - RAG Service enabled: {config.ENABLE_RAG_SERVICE}")
-        print(f"   - DuckDuckGo enabled: {config.ENABLE_DUCKDUCKGO_SEARCH}")
-        print(f"   - Agent timeout: {config.AGENT_TIMEOUT}s")
-        return True
-    except Exception as e:
-        print(f"❌ Configuration test failed: {e}")
-        return False
+    print(f"✅ Configuration loaded successfully")
+    print(f"   - Tavily API enabled: {config.ENABLE_TAVILY_SEARCH}")
+    print(f"   - RAG Service enabled: {config.ENABLE_RAG_SERVICE}")
+    print(f"   - DuckDuckGo enabled: {config.ENABLE_DUCKDUCKGO_SEARCH}")
+    print(f"   - Agent timeout: {config.AGENT_TIMEOUT}s")
 
-def test_service_manager():
+async def test_service_manager(service_manager, agent_timeout):
     """Test service manager initialization"""
     print("\n🔧 Testing service manager...")
-    try:
-        from src.services.service_manager import service_manager
-        status = service_manager.get_service_status()
-        print(f"✅ Service manager initialized successfully")
-        print(f"   - Active services: {status['active_count']}/{status['total_count']}")
-        for service, status_val in status['services'].items():
-            print(f"   - {service}: {status_val}")
-        return True
-    except Exception as e:
-        print(f"❌ Service manager test failed: {e}")
-        traceback.print_exc()
-        return False
+    status = await call(agent_timeout, service_manager.get_service_status)
+    print(f"✅ Service manager initialized successfully")
+    print(f"   - Active services: {status['active_count']}/{status['total_count']}")
+    if status['services']:
+        print("\n".join(f"   - {service}: {status_val}" for service, status_val in status['services'].items()))
 
-def test_tavily_service():
+async def test_tavily_service(service_manager, agent_timeout):
     """Test Tavily shopping service"""
     print("\n🔧 Testing Tavily service...")
-    try:
-        from src.services.service_manager import service_manager
-        results = service_manager.search_tavily("milk", 2)
-        print(f"✅ Tavily service working")
-        print(f"   - Results found: {len(results)}")
-        if results:
-            print(f"   - Sample result: {results[0]['name'][:50]}...")
-        return True
-    except Exception as e:
-        print(f"❌ Tavily service test failed: {e}")
-        return False
+    results = await call(agent_timeout, service_manager.search_tavily, "milk", 2)
+    print(f"✅ Tavily service working")
+    print(f"   - Results found: {len(results)}")
+    if results:
+        print(f"   - Sample result: {results[0]['name'][:50]}...")
 
-def test_duckduckgo_service():
+async def test_duckduckgo_service(service_manager, agent_timeout):
     """Test DuckDuckGo shopping service"""
     print("\n🔧 Testing DuckDuckGo service...")
-    try:
-        from src.services.service_manager import service_manager
-        results = service_manager.search_duckduckgo("rice", 2)
-        print(f"✅ DuckDuckGo service working")
-        print(f"   - Results found: {len(results)}")
-        if results:
-            print(f"   - Sample result: {results[0]['name'][:50]}...")
-        return True
-    except Exception as e:
-        print(f"❌ DuckDuckGo service test failed: {e}")
-        return False
+    results = await call(agent_timeout, service_manager.search_duckduckgo, "rice", 2)
+    print(f"✅ DuckDuckGo service working")
+    print(f"   - Results found: {len(results)}")
+    if results:
+        print(f"   - Sample result: {results[0]['name'][:50]}...")
 
-def test_price_comparison():
+async def test_price_comparison(service_manager, agent_timeout):
     """Test price comparison functionality"""
     print("\n🔧 Testing price comparison...")
-    try:
-        from src.services.service_manager import service_manager
-        comparison = service_manager.get_price_comparison("paneer")
-        print(f"✅ Price comparison working")
-        if 'error' not in comparison:
-            print(f"   - Price range available: {'price_range' in comparison}")
-            print(f"   - Recommendations available: {'recommendations' in comparison}")
-        else:
-            print(f"   - Using fallback data: {comparison.get('source', 'unknown')}")
-        return True
-    except Exception as e:
-        print(f"❌ Price comparison test failed: {e}")
-        return False
+    comparison = await call(agent_timeout, service_manager.get_price_comparison, "paneer")
+    print(f"✅ Price comparison working")
+    if 'error' not in comparison:
+        print(f"   - Price range available: {'price_range' in comparison}")
+        print(f"   - Recommendations available: {'recommendations' in comparison}")
+    else:
+        print(f"   - Using fallback data: {comparison.get('source', 'unknown')}")
 
-def test_local_search():
+async def test_local_search(shopping, agent_timeout):
     """Test local shopping database search"""
     print("\n🔧 Testing local search...")
+    
+    # Try to initialize models
     try:
-        from src.routes.shopping import search_shopping_items, initialize_shopping_models
-        
-        # Try to initialize models
-        try:
-            initialize_shopping_models()
-            print("✅ Local models initialized")
-        except Exception as e:
-            print(f"⚠️  Local models initialization warning: {e}")
-        
-        # Test search
-        results = search_shopping_items("spinach", 2)
-        print(f"✅ Local search working")
-        print(f"   - Results found: {len(results)}")
-        if results:
-            print(f"   - Sample result: {results[0]['name']}")
-        return True
+        await call(LOCAL_MODELS_TIMEOUT, shopping.initialize_shopping_models)
+        print("✅ Local models initialized")
     except Exception as e:
-        print(f"❌ Local search test failed: {e}")
-        return False
+        print(f"⚠️  Local models initialization warning: {e}")
+    
+    # Test search
+    results = await call(agent_timeout, shopping.search_shopping_items, "spinach", 2)
+    print(f"✅ Local search working")
+    print(f"   - Results found: {len(results)}")
+    if results:
+        print(f"   - Sample result: {results[0]['name']}")
 
-def test_health_check():
+async def test_health_check(service_manager, agent_timeout):
     """Test overall system health"""
     print("\n🔧 Testing system health...")
-    try:
-        from src.services.service_manager import service_manager
-        health = service_manager.health_check()
-        print(f"✅ Health check completed")
-        print(f"   - Overall health: {health['overall_health']}")
-        print(f"   - Fallback available: {health['fallback_available']}")
-        
-        for service, status in health['services'].items():
-            print(f"   - {service}: {status['status']}")
-        return True
-    except Exception as e:
-        print(f"❌ Health check test failed: {e}")
-        return False
+    health = await call(agent_timeout, service_manager.health_check)
+    print(f"✅ Health check completed")
+    print(f"   - Overall health: {health['overall_health']}")
+    print(f"   - Fallback available: {health['fallback_available']}")
+    
+    if health['services']:
+        print("\n".join(f"   - {service}: {status['status']}" for service, status in health['services'].items()))
 
 def main():
     """Run all tests"""
-    print("🚀 Starting Shopping Agents Test Suite")
-    print("=" * 50)
-    
-    tests = [
-        test_config,
-        test_service_manager,
-        test_tavily_service,
-        test_duckduckgo_service,
-        test_price_comparison,
-        test_local_search,
-        test_health_check
-    ]
+    # Full tracebacks only when debugging, as before the move to pytest
+    args = [__file__, "-v", "--tb=long" if os.environ.get("DEBUG_TESTS") else "--tb=short"]
     
-    passed = 0
-    total = len(tests)
+    # Spread the tests over worker processes when pytest-xdist is installed;
+    # every worker repeats the fixture imports, so don't start idle ones
+    if importlib.util.find_spec("xdist") is not None:
+        test_count = sum(name.startswith("test_") and inspect.iscoroutinefunction(obj)
+                         for name, obj in globals().items())
+        args += ["-n", str(min(test_count, os.cpu_count() or 1))]
     
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} crashed: {e}")
-    
-    print("\n" + "=" * 50)
-    print(f"🏁 Test Results: {passed}/{total} tests passed")
-    
-    if passed == total:
-        print("🎉 All agents are working properly!")
-        return 0
-    elif passed >= total // 2:
-        print("⚠️  Most agents are working, some issues detected")
-        return 1
-    else:
-        print("❌ Multiple agent failures detected")
-        return 2
+    return pytest.main(args)
 
 if __name__ == "__main__":
     exit_code = main()
-    sys.exit(exit_code)
\ No newline at end of file
+    sys.exit(exit_code)